@@ -882,6 +882,8 @@ void setup() {
   // 上电后不自动执行任何动作，只设置初始值
   servo.write(0);  // 舵机角度设为0（不运动）
   stepperPosition = 0;  // 步进电机位置计数器重置为0（不实际移动）
+
+  Serial.println("READY");  // 上位机据此结束启动等待
 }
 
 void loop() {
@@ -3,13 +3,77 @@ Arduino 多组件同步控制系统 - Python控制脚本
 支持主工作模式和调试模式
 """
 
+import select
 import serial
 import serial.tools.list_ports
+import sys
 import time
 
+_rx_tail = {}  # 各串口上次读到的半行，下次拼接
+
+# 单字母命令用frozenset成员测试（含常见大小写变体），替代先lower()
+# 再逐个==比较——每次循环省掉一次字符串分配
+_EXIT_CMDS = frozenset(('q', 'Q', 'quit', 'Quit', 'QUIT'))
+_HELP_CMDS = frozenset(('h', 'H', 'help', 'Help', 'HELP'))
+
+def wait_readable(ser, timeout=0.2):
+    """等待设备响应就绪：数据一到立即返回，最多等timeout秒
+
+    替代固定时长的sleep——5毫秒就回来的应答不用陪睡剩下的195毫秒。
+    Windows下select不支持串口句柄，保留定时等待。
+    """
+    if sys.platform == 'win32':
+        time.sleep(timeout)
+        return
+    select.select([ser.fileno()], [], [], timeout)
+
+def drain_lines(ser):
+    """一次性读走串口缓冲区的数据并按行拆分
+
+    用一次read(in_waiting)代替逐行readline()，把N次系统调用合并为1次。
+    末尾可能被截断的半行以bytes留在_rx_tail里，下次继续拼接——
+    只解码完整的行，读边界落在多字节字符中间时不会丢字节。
+    """
+    n = ser.in_waiting
+    if not n:
+        return []
+    data = _rx_tail.get(ser.port, b'') + ser.read(n)
+    lines = data.split(b'\n')
+    _rx_tail[ser.port] = lines.pop()
+    return [m for m in (line.decode('utf-8', errors='ignore').strip() for line in lines) if m]
+
+def wait_for_boot(ser, timeout=2.0):
+    """等待设备复位完成，返回启动消息行列表
+
+    固件在setup()结尾打印READY，收到即认为设备就绪、立刻返回；
+    不打印READY的旧固件仍以原来的2秒为上限。
+    """
+    banner = bytearray()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        chunk = ser.read(ser.in_waiting or 1)
+        if chunk:
+            banner += chunk
+            if b'READY' in banner:
+                break
+    return [m.strip() for m in banner.decode('utf-8', errors='ignore').splitlines() if m.strip()]
+
+_ports_cache = None
+_ports_cache_time = 0.0
+_PORTS_CACHE_TTL = 2.0  # 秒
+
 def list_available_ports():
-    """列出所有可用的串口"""
-    ports = serial.tools.list_ports.comports()
+    """列出所有可用的串口
+
+    comports()在Linux上要遍历/sys/class/tty并逐个查询udev；扫描结果
+    按2秒TTL缓存，脚本化的自动重连循环不再被重复枚举拖慢。
+    """
+    global _ports_cache, _ports_cache_time
+    now = time.monotonic()
+    if _ports_cache is None or now - _ports_cache_time > _PORTS_CACHE_TTL:
+        _ports_cache = serial.tools.list_ports.comports()
+        _ports_cache_time = now
+    ports = _ports_cache
     print("\n=== 可用串口 ===")
     for i, port in enumerate(ports):
         print(f"{i+1}. {port.device} - {port.description}")
@@ -39,15 +103,24 @@ def connect_arduino():
     try:
         # 连接Arduino (波特率 115200)
         ser = serial.Serial(selected_port, 115200, timeout=1)
+        # Windows默认4KB驱动接收缓冲在调试打印突发下会溢出丢字节，
+        # 调到64KB；Linux上开低延迟模式（FTDI的16ms延迟定时器降到1-2ms）
+        if sys.platform == 'win32':
+            try:
+                ser.set_buffer_size(rx_size=1 << 16, tx_size=1 << 16)
+            except (AttributeError, ValueError):
+                pass
+        else:
+            try:
+                ser.set_low_latency_mode(True)
+            except (AttributeError, NotImplementedError, ValueError):
+                pass  # 平台（macOS/BSD）或驱动（内置串口）不支持时维持默认
         print(f"\n✓ 已连接到 {selected_port}")
         print("等待Arduino初始化...")
-        time.sleep(2)  # 等待Arduino重启
-        
-        # 读取Arduino的初始化消息
-        while ser.in_waiting:
-            msg = ser.readline().decode('utf-8', errors='ignore').strip()
-            if msg:
-                print(f"Arduino: {msg}")
+
+        # 读取Arduino的初始化消息：收到READY标记立即继续，不再固定等2秒
+        for msg in wait_for_boot(ser):
+            print(f"Arduino: {msg}")
         
         return ser
     
@@ -56,43 +129,49 @@ def connect_arduino():
         print(f"详情: {e}")
         return None
 
+# 帮助文本在导入时构建一次：一次write输出，替代每次调用的几十个print
+_HELP = """============================================================
+控制指令说明
+============================================================
+
+【主工作模式】（执行→停止10s→自动复位）
+  f,<百分比>  - 前进（例如: f,20 表示前进20%）
+  b,<百分比>  - 后退（例如: b,50 表示后退50%）
+  说明：执行后停止10秒，然后自动反向复位相同时间
+  注意：每次指令后有30s控制间隙（除强制停止外）
+
+【调试模式】（单独控制组件）
+  GROUP1,<方向>,<百分比>  - 控制组1伸缩杆（1-6）
+  GROUP2,<方向>,<百分比>  - 控制组2伸缩杆（7-14）
+  STEPPER,<方向>,<百分比> - 控制步进电机滑台
+  SERVO,<角度>,<百分比>   - 控制舵机
+  方向：F=前进/右移, B=后退/左移, L=左移, R=右移, S=停止
+  示例：
+    GROUP1,F,20      - 组1前进20%
+    STEPPER,L,30     - 步进电机左移30%
+    SERVO,180,50     - 舵机转到180度的50%（即90度）
+    GROUP1+STEPPER,F,20  - 组合控制：组1和步进电机同时前进20%
+
+【初始状态恢复】
+  START 或 START,ALL  - 恢复所有组件到初始状态
+  START,ACTUATORS     - 只恢复伸缩杆（前进20cm，后退10cm，居中）
+  START,STEPPER       - 只重置步进电机位置计数器为0（不实际移动）
+  START,SERVO         - 只恢复舵机到0度
+  START,ACTUATORS+SERVO - 组合恢复（例如）
+
+【强制停止】
+  s  - 强制停止所有运动，并清零控制间隙
+
+【其他】
+  h  - 显示此帮助信息
+  q  - 退出程序
+============================================================
+"""
+
 def print_help():
-    """打印帮助信息"""
-    print("\n" + "=" * 60)
-    print("控制指令说明")
-    print("=" * 60)
-    print("\n【主工作模式】（执行→停止10s→自动复位）")
-    print("  f,<百分比>  - 前进（例如: f,20 表示前进20%）")
-    print("  b,<百分比>  - 后退（例如: b,50 表示后退50%）")
-    print("  说明：执行后停止10秒，然后自动反向复位相同时间")
-    print("  注意：每次指令后有30s控制间隙（除强制停止外）")
-    
-    print("\n【调试模式】（单独控制组件）")
-    print("  GROUP1,<方向>,<百分比>  - 控制组1伸缩杆（1-6）")
-    print("  GROUP2,<方向>,<百分比>  - 控制组2伸缩杆（7-14）")
-    print("  STEPPER,<方向>,<百分比> - 控制步进电机滑台")
-    print("  SERVO,<角度>,<百分比>   - 控制舵机")
-    print("  方向：F=前进/右移, B=后退/左移, L=左移, R=右移, S=停止")
-    print("  示例：")
-    print("    GROUP1,F,20      - 组1前进20%")
-    print("    STEPPER,L,30     - 步进电机左移30%")
-    print("    SERVO,180,50     - 舵机转到180度的50%（即90度）")
-    print("    GROUP1+STEPPER,F,20  - 组合控制：组1和步进电机同时前进20%")
-    
-    print("\n【初始状态恢复】")
-    print("  START 或 START,ALL  - 恢复所有组件到初始状态")
-    print("  START,ACTUATORS     - 只恢复伸缩杆（前进20cm，后退10cm，居中）")
-    print("  START,STEPPER       - 只重置步进电机位置计数器为0（不实际移动）")
-    print("  START,SERVO         - 只恢复舵机到0度")
-    print("  START,ACTUATORS+SERVO - 组合恢复（例如）")
-    
-    print("\n【强制停止】")
-    print("  s  - 强制停止所有运动，并清零控制间隙")
-    
-    print("\n【其他】")
-    print("  h  - 显示此帮助信息")
-    print("  q  - 退出程序")
-    print("=" * 60)
+    """打印帮助信息（单次write输出预构建的帮助文本）"""
+    sys.stdout.write("\n" + _HELP)
+    sys.stdout.flush()
 
 def main():
     print("=" * 60)
@@ -109,10 +188,8 @@ def main():
     try:
         while True:
             # 读取Arduino的反馈消息
-            while ser.in_waiting:
-                msg = ser.readline().decode('utf-8', errors='ignore').strip()
-                if msg:
-                    print(f"Arduino: {msg}")
+            for msg in drain_lines(ser):
+                print(f"Arduino: {msg}")
             
             # 获取用户输入
             try:
@@ -122,18 +199,16 @@ def main():
             
             if not command:
                 continue
-            
-            command_lower = command.lower()
-            
+
             # 退出命令
-            if command_lower == 'q' or command_lower == 'quit':
+            if command in _EXIT_CMDS:
                 print("\n正在退出...")
                 ser.write(b's\n')  # 退出前先停止电机
                 time.sleep(0.1)
                 break
-            
+
             # 帮助命令
-            if command_lower == 'h' or command_lower == 'help':
+            if command in _HELP_CMDS:
                 print_help()
                 continue
             
@@ -141,15 +216,21 @@ def main():
             try:
                 ser.write((command + "\n").encode())
                 print(f"✓ 已发送指令: {command}")
-                time.sleep(0.2)  # 等待Arduino响应
-                
-                # 立即读取Arduino返回
-                response_count = 0
-                while ser.in_waiting and response_count < 10:
-                    msg = ser.readline().decode('utf-8', errors='ignore').strip()
-                    if msg:
+                # 等待并读取Arduino返回：UART逐字节到达，首字节就绪
+                # 不代表整段回复已到，所以在0.2秒预算内循环等待-读取，
+                # 直到回复间隙超过50ms（输出转入安静）或预算用尽
+                deadline = time.monotonic() + 0.2
+                gap = 0.2
+                while True:
+                    timeout = min(gap, deadline - time.monotonic())
+                    if timeout <= 0:
+                        break
+                    wait_readable(ser, timeout)
+                    if not ser.in_waiting:
+                        break  # 预算内无新数据，回复已结束
+                    for msg in drain_lines(ser):
                         print(f"  ← {msg}")
-                        response_count += 1
+                    gap = 0.05  # 已收到数据：之后只再等一个短暂的行间隙
             except Exception as e:
                 print(f"错误：发送命令失败 - {e}")
     
@@ -3,11 +3,61 @@
 保留现有控制脚本不变，新脚本直接连接两个设备并发送命令
 """
 
+import os
+import re
 import serial
 import serial.tools.list_ports
+import selectors
+import sys
 import time
 import threading
-import queue
+
+# WAVE_SPAWN行一次正则扫描提取三个字段，替代split()+逐项split('=')建字典；
+# 直接在bytes上匹配，只解码真正要打印的内容
+# （固件固定按 n= speed= phase= 的顺序输出，见sketch_nov20a）
+WAVE_RE = re.compile(rb'^WAVE_SPAWN\s+n=(\S+)\s+speed=(\S+)\s+phase=(\S+)')
+
+# 调试模式关键字：一次正则扫描替代对四个关键字各做一遍子串查找
+DEBUG_RE = re.compile(r'group[12]|stepper|servo')
+
+# 帮助文本在导入时构建一次：一次write输出，替代每次调用的20多个print
+_HELP = """======================================================================
+统一控制系统 - 指令说明
+======================================================================
+
+【联动模式】（同时控制Arduino和ESP32）
+  f,<0-100>  - 联动命令：
+                • ESP32: 设置LED亮度为 <值>
+                • Arduino: 前进 <值>%
+                示例: f,50  → LED亮度50，机械前进50%
+
+  b,<0-100>  - 联动命令：
+                • Arduino: 后退 <值>%
+                • ESP32: LED亮度降低（100-<值>）
+                示例: b,30  → 机械后退30%，LED亮度70
+
+  s          - 联动停止：
+                • Arduino: 强制停止所有运动
+                • ESP32: 暂停/恢复虚拟位置移动
+
+【Arduino独立控制】
+  START[...]  - 恢复初始状态
+  GROUP1/2,<方向>,<百分比>  - 控制伸缩杆组
+  STEPPER,<方向>,<百分比>   - 控制步进电机
+  SERVO,<角度>,<百分比>      - 控制舵机
+  说明：这些命令只发送到Arduino，不影响ESP32
+
+【系统命令】
+  q  - 退出程序（Arduino停止，ESP32关闭所有灯）
+  h  - 显示此帮助信息
+======================================================================
+
+【提示】
+  • 现有脚本 control_led.py 和 control_test.py 保持不变
+  • 可以继续使用原有脚本单独控制设备
+  • 本脚本用于统一联动控制两个设备
+======================================================================
+"""
 
 class UnifiedController:
     """统一控制器，管理Arduino和ESP32两个设备"""
@@ -16,11 +66,29 @@ class UnifiedController:
         self.arduino_ser = None  # 机械系统（Arduino）
         self.esp32_ser = None    # LED系统（ESP32）
         self.running = True
-        self.message_queue = queue.Queue()
+        self._tail = {}  # 各设备上次读到的半行，下次拼接
+        self._print_lock = threading.Lock()  # 读取线程与主线程共用stdout
+        self._prompt = None  # 正在等待输入的提示符文本（无则为None）
+        self._wake_r, self._wake_w = os.pipe()  # 自唤醒管道：通知读取线程退出
+        self._cached_ports = None  # comports()扫描结果缓存，两次连接共用
+        # 预编码的命令字节表：固定词表加0-100整数百分比。
+        # 发送路径直接查表取bytes，省去每次的字符串拼接和编码；
+        # 非整数百分比等查不到的命令走原来的编码路径
+        self._cmd_bytes = {'s': b's\n', 'q': b'q\n', 'h': b'h\n'}
+        for i in range(101):
+            self._cmd_bytes[f'f,{i}'] = f'f,{i}\n'.encode()
+            self._cmd_bytes[f'b,{i}'] = f'b,{i}\n'.encode()
     
-    def list_available_ports(self):
-        """列出所有可用的串口"""
-        ports = serial.tools.list_ports.comports()
+    def list_available_ports(self, refresh=False):
+        """列出所有可用的串口
+
+        comports()在Linux上要遍历/sys/class/tty并逐个查询udev，开销
+        可达几十毫秒，这里缓存首次扫描结果供两次连接共用；
+        refresh=True时强制重新扫描。
+        """
+        if refresh or self._cached_ports is None:
+            self._cached_ports = serial.tools.list_ports.comports()
+        ports = self._cached_ports
         print("\n=== 可用串口 ===")
         for i, port in enumerate(ports):
             print(f"{i+1}. {port.device} - {port.description}")
@@ -51,35 +119,49 @@ class UnifiedController:
         if not default_port:
             while True:
                 try:
-                    choice = input(f"请选择串口 (1-{len(ports)}, 回车使用第一个): ").strip()
+                    choice = input(f"请选择串口 (1-{len(ports)}, 回车使用第一个, r重新扫描): ").strip()
+                    if choice in ('r', 'R'):
+                        # 重新枚举：首次扫描后才插入的设备也能被选到
+                        ports = self.list_available_ports(refresh=True)
+                        if not ports:
+                            print(f"错误：没有找到可用的串口！")
+                            return None
+                        continue
                     if not choice:
                         # 回车使用第一个
                         port_index = 0
                     else:
                         port_index = int(choice) - 1
-                    
+
                     if 0 <= port_index < len(ports):
                         break
                     print("无效选择，请重试")
                 except ValueError:
-                    print("请输入数字或直接回车")
-            
+                    print("请输入数字、r或直接回车")
+
             selected_port = ports[port_index].device
         
         try:
             ser = serial.Serial(selected_port, 115200, timeout=1)
+            # 调大接收缓冲并关闭流控：设备突发输出（调试打印、波生成日志）时
+            # 内核能整块积累、整块交付，配合批量read减少系统调用
+            if hasattr(ser, 'set_buffer_size'):  # 仅Windows提供
+                try:
+                    ser.set_buffer_size(rx_size=65536, tx_size=4096)
+                except Exception:
+                    pass
+            ser.xonxoff = False
+            ser.rtscts = False
+            if sys.platform != 'win32':
+                # 字节间超时：短消息尽快返回，突发仍可成块积累
+                ser.inter_byte_timeout = 0.005
             print(f"✓ 已连接到 {device_name}: {selected_port}")
             print("等待设备初始化...")
-            time.sleep(2)  # 等待设备重启
-            
-            # 读取初始化消息
-            init_messages = []
-            while ser.in_waiting:
-                msg = ser.readline().decode('utf-8', errors='ignore').strip()
-                if msg:
-                    init_messages.append(msg)
-                    print(f"  {device_name}: {msg}")
-            
+
+            # 读取启动消息：收到READY标记立即继续，不再固定等2秒
+            for msg in self._wait_for_boot(ser):
+                print(f"  {device_name}: {msg}")
+
             return ser
         
         except serial.SerialException as e:
@@ -87,59 +169,154 @@ class UnifiedController:
             print(f"详情: {e}")
             return None
     
-    def send_command(self, ser, command, device_name):
-        """向设备发送命令"""
+    def _wait_for_boot(self, ser, timeout=2.0):
+        """等待设备复位完成，返回启动消息行列表
+
+        固件在setup()结尾打印READY，收到即认为设备就绪、立刻返回——
+        等的是信号而不是最坏情况的定时器：新板子几十毫秒即就绪，
+        不打印READY的旧固件仍以原来的2秒为上限。
+        """
+        banner = bytearray()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            chunk = ser.read(ser.in_waiting or 1)
+            if chunk:
+                banner += chunk
+                if b'READY' in banner:
+                    break
+        return [m.strip() for m in banner.decode('utf-8', errors='ignore').splitlines() if m.strip()]
+
+    def send_command(self, ser, command, device_name, delay=True):
+        """向设备发送命令
+
+        delay=False时不等待，供批量发送路径先提交所有写入、再统一等待。
+        """
         if ser is None or not ser.is_open:
             print(f"警告：{device_name} 未连接，跳过命令")
             return False
-        
+
         try:
-            ser.write((command + "\n").encode())
+            payload = self._cmd_bytes.get(command)
+            if payload is None:
+                # 命令词表都是ASCII：ASCII编码器比UTF-8快数倍，且保证
+                # 换行符和命令在同一个bytes里一次write写出（固件按\n断帧）
+                payload = command.encode('ascii', 'ignore') + b'\n'
+            ser.write(payload)
             print(f"  → {device_name}: {command}")
-            time.sleep(0.1)
+            if delay:
+                time.sleep(0.1)
             return True
         except Exception as e:
             print(f"错误：向 {device_name} 发送命令失败 - {e}")
             return False
+
+    def send_parallel(self, arduino_cmd, esp32_cmd):
+        """联动模式批量发送：先提交两个写入，再统一等待一次
+
+        两个USB传输在各自端点上并行进行，把原来串行的
+        write→sleep→write→sleep（约200ms）压缩到一次100ms等待。
+        """
+        sent = False
+        if arduino_cmd:
+            sent |= self.send_command(self.arduino_ser, arduino_cmd, "Arduino", delay=False)
+        if esp32_cmd:
+            sent |= self.send_command(self.esp32_ser, esp32_cmd, "ESP32", delay=False)
+        if sent:
+            time.sleep(0.1)
+        return sent
     
+    def _emit(self, text):
+        """线程安全地输出一行设备消息
+
+        提示符挂起期间（主线程阻塞在input上），先回车清掉提示符行、
+        打印消息、再重绘提示符——设备消息和用户输入真正重叠，
+        而不是互相串行或把提示符冲乱。
+        """
+        with self._print_lock:
+            if self._prompt is not None:
+                sys.stdout.write('\r\x1b[K' + text + '\n' + self._prompt)
+            else:
+                sys.stdout.write(text + '\n')
+            sys.stdout.flush()
+
+    def _drain_port(self, ser, device_name):
+        """读取单个设备的待处理响应（非阻塞）
+
+        返回False表示端口已关闭或读取出错（如设备拔出），调用方可据此停止监听。
+        """
+        if ser is None or not ser.is_open:
+            return False
+        try:
+            n = ser.in_waiting
+            if not n:
+                return True
+            # 一次read读走缓冲区全部数据，把N次readline系统调用合并为1次；
+            # 末尾的半行留到下次拼接，避免消息被拆行丢失。
+            # 设备输出基本是ASCII：在bytes上拆行和匹配，只在打印时解码
+            data = self._tail.get(device_name, b'') + ser.read(n)
+            lines = data.split(b'\n')
+            self._tail[device_name] = lines.pop()
+            for raw in lines:
+                raw = raw.strip()
+                if not raw:
+                    continue
+                # 检查是否是波生成信号（ESP32）
+                m = WAVE_RE.match(raw) if device_name == "ESP32" else None
+                if m:
+                    n_val, speed_val, phase_val = (g.decode('ascii', 'replace') for g in m.groups())
+                    self._emit(f"  ← {device_name}: 🌊 [波生成] n={n_val}, 速度={speed_val}, 相位={phase_val}")
+                else:
+                    self._emit(f"  ← {device_name}: {raw.decode('utf-8', errors='ignore')}")
+        except:
+            return False
+        return True
+
     def read_responses(self):
         """读取设备响应（非阻塞）"""
-        # 读取Arduino响应
-        if self.arduino_ser and self.arduino_ser.is_open:
-            try:
-                response_count = 0
-                while self.arduino_ser.in_waiting and response_count < 10:
-                    msg = self.arduino_ser.readline().decode('utf-8', errors='ignore').strip()
-                    if msg:
-                        print(f"  ← Arduino: {msg}")
-                        response_count += 1
-            except:
-                pass
-        
-        # 读取ESP32响应
-        if self.esp32_ser and self.esp32_ser.is_open:
-            try:
-                response_count = 0
-                while self.esp32_ser.in_waiting and response_count < 10:
-                    msg = self.esp32_ser.readline().decode('utf-8', errors='ignore').strip()
-                    if msg:
-                        # 检查是否是波生成信号
-                        if msg.startswith("WAVE_SPAWN"):
-                            parts = msg.split()
-                            wave_info = {}
-                            for part in parts[1:]:
-                                if '=' in part:
-                                    key, value = part.split('=')
-                                    wave_info[key] = value
-                            n_val = wave_info.get('n', '?')
-                            speed_val = wave_info.get('speed', '?')
-                            phase_val = wave_info.get('phase', '?')
-                            print(f"  ← ESP32: 🌊 [波生成] n={n_val}, 速度={speed_val}, 相位={phase_val}")
-                        else:
-                            print(f"  ← ESP32: {msg}")
-                        response_count += 1
-            except:
-                pass
+        self._drain_port(self.arduino_ser, "Arduino")
+        self._drain_port(self.esp32_ser, "ESP32")
+
+    def read_loop(self):
+        """响应读取循环
+
+        POSIX上把两个串口的文件描述符注册到selectors（Linux为epoll，
+        macOS/BSD为kqueue），无限期阻塞等待数据到达——空闲时线程完全
+        不占CPU也不再定时醒来，内核就绪通知驱动一切。退出通过自唤醒
+        管道触发（stop()写一个字节），不依赖超时轮询running标志。
+        Windows下selectors不支持串口句柄，保留原有的轮询方式。
+        """
+        if sys.platform == 'win32':
+            while self.running:
+                self.read_responses()
+                time.sleep(0.1)
+            return
+
+        sel = selectors.DefaultSelector()
+        sel.register(self._wake_r, selectors.EVENT_READ, data=None)
+        for device_name, ser in (("Arduino", self.arduino_ser), ("ESP32", self.esp32_ser)):
+            if ser is not None and ser.is_open:
+                sel.register(ser.fileno(), selectors.EVENT_READ, data=(device_name, ser))
+
+        try:
+            while self.running:
+                for key, _ in sel.select(timeout=None):
+                    if key.data is None:
+                        os.read(self._wake_r, 64)  # 清掉唤醒字节，running已置False
+                        continue
+                    device_name, ser = key.data
+                    if not self._drain_port(ser, device_name):
+                        # 端口已关闭或设备拔出：注销，避免select对坏fd空转
+                        sel.unregister(key.fd)
+        finally:
+            sel.close()
+
+    def stop(self):
+        """请求读取线程退出并唤醒阻塞中的select"""
+        self.running = False
+        try:
+            os.write(self._wake_w, b'\0')
+        except OSError:
+            pass
     
     def parse_command(self, command):
         """
@@ -157,34 +334,26 @@ class UnifiedController:
         if command_lower in ['h', 'help']:
             return (None, None, 'help')
         
-        # 联动命令：f,<值> - 同时控制亮度和前进
-        if command_lower.startswith('f,'):
-            try:
-                parts = command_lower.split(',')
-                if len(parts) == 2:
-                    value = float(parts[1])
-                    if 0 <= value <= 100:
-                        # 联动：LED设置亮度，机械前进相同百分比
-                        return (f'f,{value}', f'f,{value}', 'both')
-                    else:
-                        return (None, None, 'error')
-            except (ValueError, IndexError):
-                return (None, None, 'error')
-        
-        # 联动命令：b,<值> - 机械后退，LED亮度降低
-        if command_lower.startswith('b,'):
+        # 联动命令：f,<值>同时控制亮度和前进；b,<值>机械后退、LED亮度降低
+        # partition单趟扫描取出头尾；用户多数输入0-100的整数，
+        # int比float快一倍且让命令正好命中预编码字节表，浮点只作兜底
+        head, _, tail = command_lower.partition(',')
+        if head in ('f', 'b') and tail:
             try:
-                parts = command_lower.split(',')
-                if len(parts) == 2:
-                    value = float(parts[1])
-                    if 0 <= value <= 100:
-                        # 联动：机械后退，LED亮度降低（映射到0-100）
-                        led_value = max(0, 100 - value)  # 后退时亮度降低
-                        return (f'b,{value}', f'f,{led_value}', 'both')
-                    else:
-                        return (None, None, 'error')
-            except (ValueError, IndexError):
+                value = int(tail)
+            except ValueError:
+                try:
+                    value = float(tail)
+                except ValueError:
+                    return (None, None, 'error')
+            if not 0 <= value <= 100:
                 return (None, None, 'error')
+            if head == 'f':
+                # 联动：LED设置亮度，机械前进相同百分比
+                return (f'f,{value}', f'f,{value}', 'both')
+            # 联动：机械后退，LED亮度降低（映射到0-100）
+            led_value = max(0, 100 - value)  # 后退时亮度降低
+            return (f'b,{value}', f'f,{led_value}', 'both')
         
         # 暂停/停止命令
         if command_lower == 's':
@@ -195,7 +364,7 @@ class UnifiedController:
             return (command, None, 'arduino')
         
         # 调试模式命令 - 仅Arduino
-        if any(keyword in command_lower for keyword in ['group1', 'group2', 'stepper', 'servo']):
+        if DEBUG_RE.search(command_lower):
             return (command, None, 'arduino')
         
         # 默认：如果无法识别，尝试发送到两个设备（可能是不认识的命令）
@@ -203,44 +372,10 @@ class UnifiedController:
         return (None, None, 'unknown')
     
     def print_help(self):
-        """打印帮助信息"""
-        print("\n" + "=" * 70)
-        print("统一控制系统 - 指令说明")
-        print("=" * 70)
-        
-        print("\n【联动模式】（同时控制Arduino和ESP32）")
-        print("  f,<0-100>  - 联动命令：")
-        print("                • ESP32: 设置LED亮度为 <值>")
-        print("                • Arduino: 前进 <值>%")
-        print("                示例: f,50  → LED亮度50，机械前进50%")
-        
-        print("\n  b,<0-100>  - 联动命令：")
-        print("                • Arduino: 后退 <值>%")
-        print("                • ESP32: LED亮度降低（100-<值>）")
-        print("                示例: b,30  → 机械后退30%，LED亮度70")
-        
-        print("\n  s          - 联动停止：")
-        print("                • Arduino: 强制停止所有运动")
-        print("                • ESP32: 暂停/恢复虚拟位置移动")
-        
-        print("\n【Arduino独立控制】")
-        print("  START[...]  - 恢复初始状态")
-        print("  GROUP1/2,<方向>,<百分比>  - 控制伸缩杆组")
-        print("  STEPPER,<方向>,<百分比>   - 控制步进电机")
-        print("  SERVO,<角度>,<百分比>      - 控制舵机")
-        print("  说明：这些命令只发送到Arduino，不影响ESP32")
-        
-        print("\n【系统命令】")
-        print("  q  - 退出程序（Arduino停止，ESP32关闭所有灯）")
-        print("  h  - 显示此帮助信息")
-        print("=" * 70)
-        
-        print("\n【提示】")
-        print("  • 现有脚本 control_led.py 和 control_test.py 保持不变")
-        print("  • 可以继续使用原有脚本单独控制设备")
-        print("  • 本脚本用于统一联动控制两个设备")
-        print("=" * 70)
-    
+        """打印帮助信息（单次write输出预构建的帮助文本）"""
+        sys.stdout.write("\n" + _HELP)
+        sys.stdout.flush()
+
     def run(self):
         """主运行循环"""
         print("=" * 70)
@@ -265,22 +400,20 @@ class UnifiedController:
         
         self.print_help()
         
-        # 启动响应读取线程
-        def read_loop():
-            while self.running:
-                self.read_responses()
-                time.sleep(0.1)
-        
-        read_thread = threading.Thread(target=read_loop, daemon=True)
+        # 启动响应读取线程（事件驱动，见read_loop）
+        read_thread = threading.Thread(target=self.read_loop, daemon=True)
         read_thread.start()
         
         try:
             while True:
-                # 获取用户输入
+                # 获取用户输入（挂起提示符，读取线程打印时会重绘它）
+                self._prompt = "输入指令: "
                 try:
                     command = input("\n输入指令: ").strip()
                 except (EOFError, KeyboardInterrupt):
                     break
+                finally:
+                    self._prompt = None
                 
                 if not command:
                     continue
@@ -306,11 +439,8 @@ class UnifiedController:
                 print(f"\n【执行命令: {command}】")
                 
                 if mode == 'both':
-                    # 联动模式：同时发送到两个设备
-                    if arduino_cmd:
-                        self.send_command(self.arduino_ser, arduino_cmd, "Arduino")
-                    if esp32_cmd:
-                        self.send_command(self.esp32_ser, esp32_cmd, "ESP32")
+                    # 联动模式：批量发送到两个设备（见send_parallel）
+                    self.send_parallel(arduino_cmd, esp32_cmd)
                 
                 elif mode == 'arduino':
                     # 仅Arduino
@@ -326,17 +456,15 @@ class UnifiedController:
                     else:
                         print("警告：ESP32命令为空")
                 
-                time.sleep(0.2)  # 等待设备响应
-                
-                # 读取响应
-                self.read_responses()
+                # 响应由读取线程在数据到达的瞬间打印（见read_loop），
+                # 主线程不再参与读取——两个线程同时drain会竞争半行缓存
         
         except KeyboardInterrupt:
             print("\n\n检测到 Ctrl+C，正在退出...")
         
         finally:
-            self.running = False
-            
+            self.stop()
+
             # 退出前发送停止命令
             print("\n正在关闭设备...")
             if self.arduino_ser:
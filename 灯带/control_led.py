@@ -4,20 +4,210 @@ LED灯带控制系统 - Python控制脚本
 控制潮汐桥灯带（GPIO 22和23）：波浪传播效果
 """
 
+import os
+import re
+import selectors
 import serial
 import serial.tools.list_ports
+import sys
 import time
 import threading
 import queue
 
+_ports_cache = None
+_ports_cache_time = 0.0
+_PORTS_CACHE_TTL = 2.0  # 秒
+
 def list_available_ports():
-    """列出所有可用的串口"""
-    ports = serial.tools.list_ports.comports()
+    """列出所有可用的串口
+
+    comports()在Linux上要遍历/sys/class/tty并逐个查询udev；扫描结果
+    按2秒TTL缓存，脚本化的自动重连循环不再被重复枚举拖慢。
+    """
+    global _ports_cache, _ports_cache_time
+    now = time.monotonic()
+    if _ports_cache is None or now - _ports_cache_time > _PORTS_CACHE_TTL:
+        _ports_cache = serial.tools.list_ports.comports()
+        _ports_cache_time = now
+    ports = _ports_cache
     print("\n=== 可用串口 ===")
     for i, port in enumerate(ports):
         print(f"{i+1}. {port.device} - {port.description}")
     return ports
 
+class CoalescingWriter:
+    """写合并器：出站命令先进缓冲，后台线程定期一次性写出
+
+    每条命令单独write就是一次系统调用加一次USB-CDC传输；连发的
+    命令（粘贴多行、将来脚本驱动）先攒在缓冲里，每interval秒合并
+    成一次write，摊薄固定开销。q等不容延迟的命令用write_nodelay
+    绕过缓冲立即冲刷。
+
+    lock可传入共享锁：关闭串口的一方持同一把锁即可与冲刷线程互斥
+    （pyserial并不保证并发write/close安全，Windows上尤其如此）。
+    """
+
+    def __init__(self, ser, interval=0.02, lock=None):
+        self.ser = ser
+        self.interval = interval
+        self.buf = bytearray()
+        self.lock = lock if lock is not None else threading.Lock()
+        self.running = True
+        self.failed = False  # 冲刷出错（如设备拔出）后置位，后续写入抛异常
+        self._has_data = threading.Event()  # 有数据待冲刷时置位
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        """进缓冲，由后台线程在下个周期合并写出
+
+        冲刷线程已因写入错误退出时抛出异常——不能让调用方在字节
+        根本到不了设备的情况下看到“发送成功”。
+        """
+        if self.failed:
+            raise OSError("串口写入已失败，设备可能已断开")
+        with self.lock:
+            self.buf += data
+        self._has_data.set()
+
+    def write_nodelay(self, data):
+        """跳过合并等待，连同已缓冲的数据立即写出"""
+        if self.failed:
+            raise OSError("串口写入已失败，设备可能已断开")
+        with self.lock:
+            self.buf += data
+            try:
+                self._flush_locked()
+            except Exception:
+                self.failed = True
+                raise
+
+    def _flush_locked(self):
+        if self.buf:
+            self.ser.write(bytes(self.buf))
+            self.buf.clear()
+
+    def _flush_loop(self):
+        # 事件驱动：无数据时睡在wait()里零唤醒（不再每interval醒一次
+        # 空转），write置位事件后等一个合并窗口再一次写出
+        while self.running:
+            self._has_data.wait()
+            if not self.running:
+                break
+            time.sleep(self.interval)
+            try:
+                with self.lock:
+                    self._has_data.clear()
+                    self._flush_locked()
+            except Exception as e:
+                # 冲刷失败（如设备拔出）：报告并置failed，
+                # 后续write/write_nodelay会抛异常而不是假装发送成功
+                self.failed = True
+                print(f"错误：发送命令失败 - {e}", flush=True)
+                break
+
+    def close(self):
+        """停止后台线程并冲刷残留数据"""
+        self.running = False
+        self._has_data.set()  # 唤醒冲刷线程让它退出
+        try:
+            with self.lock:
+                self._flush_locked()
+        except:
+            pass
+
+def drain_lines(ser, buf):
+    """把串口缓冲区现有数据一次读走、按行拆分并解码
+
+    末尾半行留在buf（bytearray）里，下次继续拼接。拆行逻辑集中在
+    这里，系统调用合并的优化对所有调用点一致生效。
+    """
+    n = ser.in_waiting
+    if n:
+        buf += ser.read(n)
+    if b'\n' not in buf:
+        return []
+    lines = bytes(buf).split(b'\n')
+    buf[:] = lines.pop()
+    return [m for m in (line.decode('utf-8', errors='ignore').strip() for line in lines) if m]
+
+# 预编码的命令字节：固定词表加0-100整数亮度在导入时编码一次，
+# 发送路径直接查表，免去每条命令的字符串拼接和编码
+_CMD_BYTES = {'s': b's\n', 'h': b'h\n', 'q': b'q\n'}
+_F_CMDS = tuple(f"f,{i}\n".encode('ascii') for i in range(101))
+
+def encode_command(command):
+    """取命令的预编码字节；词表外的命令（如小数亮度）现场编码"""
+    cached = _CMD_BYTES.get(command)
+    if cached is not None:
+        return cached
+    if command.startswith('f,'):
+        try:
+            value = int(command[2:])
+        except ValueError:
+            pass
+        else:
+            if 0 <= value <= 100:
+                return _F_CMDS[value]
+    return (command + "\n").encode()
+
+# f,<整数>一条编译好的正则单趟完成格式校验，替代startswith+split+float
+_F_RE = re.compile(r'^[fF],(\d{1,3})$')
+
+# WAVE_SPAWN行的key=value对一次findall收齐，替代split+逐项split('=')
+_WAVE_RE = re.compile(r'(\w+)=(\S+)')
+
+# 单字母命令用frozenset成员测试（含常见大小写变体），替代先lower()
+# 再逐个==比较——每次循环省掉一次字符串分配
+_EXIT_CMDS = frozenset(('q', 'Q', 'quit', 'Quit', 'QUIT'))
+_HELP_CMDS = frozenset(('h', 'H', 'help', 'Help', 'HELP'))
+
+def send_many(writer, commands):
+    """把一批命令编码合并后一次写出
+
+    固件按\\n逐条解析，所以10条命令合并成1次write照样逐条执行，
+    系统调用和USB传输却从10次降到1次。
+    """
+    writer.write(b''.join(encode_command(c) for c in commands))
+
+def validate_command(command):
+    """校验f命令格式，返回错误提示；合法或无需校验时返回None"""
+    m = _F_RE.match(command)
+    if m:
+        # 整数快路径：正则已确认格式（大小写在模式里处理），只剩范围检查
+        if int(m.group(1)) > 100:
+            return "错误：亮度值必须在0-100之间"
+        return None
+    if not command.startswith(('f,', 'F,')):
+        return None
+    # 小数亮度等非整数形式走慢路径
+    parts = command.split(',')
+    if len(parts) != 2:
+        return "错误：f命令格式应为 f,<0-100>"
+    try:
+        value = float(parts[1])
+    except ValueError:
+        return "错误：亮度值必须是数字"
+    if value < 0 or value > 100:
+        return "错误：亮度值必须在0-100之间"
+    return None
+
+def wait_for_boot(ser, timeout=2.0):
+    """等待设备复位完成，返回启动消息行列表
+
+    固件在setup()结尾打印READY，收到即认为设备就绪、立刻返回；
+    不打印READY的旧固件仍以原来的2秒为上限。
+    """
+    banner = bytearray()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        chunk = ser.read(ser.in_waiting or 1)
+        if chunk:
+            banner += chunk
+            if b'READY' in banner:
+                break
+    return [m.strip() for m in banner.decode('utf-8', errors='ignore').splitlines() if m.strip()]
+
 def connect_arduino():
     """连接到Arduino/ESP32"""
     ports = list_available_ports()
@@ -42,15 +232,24 @@ def connect_arduino():
     try:
         # 连接Arduino/ESP32 (波特率 115200)
         ser = serial.Serial(selected_port, 115200, timeout=1)
+        # Windows默认4KB驱动接收缓冲在WAVE_SPAWN突发下会溢出丢字节，
+        # 调到64KB；Linux上开低延迟模式（FTDI的16ms延迟定时器降到1-2ms）
+        if sys.platform == 'win32':
+            try:
+                ser.set_buffer_size(rx_size=1 << 16, tx_size=1 << 16)
+            except (AttributeError, ValueError):
+                pass
+        else:
+            try:
+                ser.set_low_latency_mode(True)
+            except (AttributeError, NotImplementedError, ValueError):
+                pass  # 平台（macOS/BSD）或驱动（内置串口）不支持时维持默认
         print(f"\n✓ 已连接到 {selected_port}")
         print("等待设备初始化...")
-        time.sleep(2)  # 等待设备重启
-        
-        # 读取设备的初始化消息
-        while ser.in_waiting:
-            msg = ser.readline().decode('utf-8', errors='ignore').strip()
-            if msg:
-                print(f"设备: {msg}")
+
+        # 读取设备的初始化消息：收到READY标记立即继续，不再固定等2秒
+        for msg in wait_for_boot(ser):
+            print(f"设备: {msg}")
         
         return ser
     
@@ -59,93 +258,196 @@ def connect_arduino():
         print(f"详情: {e}")
         return None
 
+# 帮助文本在导入时构建一次：一次write输出，替代每次调用的几十个print
+_HELP = """============================================================
+LED灯带控制指令说明
+============================================================
+
+【14根灯带控制】
+  f,<0-100>  - 设置亮度值（0最低，100最高）
+              功能A：亮度映射到20-40范围
+              功能B：亮度映射到0-100范围
+              亮度从当前值平滑过渡到目标值，0→100需要16秒
+              示例：
+                f,0    - 设置亮度为0（最低）
+                f,50   - 设置亮度为50（中等）
+                f,100  - 设置亮度为100（最高）
+
+【速度控制】
+  功能B的虚拟位置传播速度：v = n + 10
+  其中 n 是 f,n 命令中的亮度值
+  例如：f,50 时，速度 v = 50 + 10 = 60 虚拟位置/秒
+
+【暂停控制】
+  s  - 暂停/恢复虚拟位置的移动
+       暂停时保持当前亮度，恢复后继续过渡
+
+【潮汐桥说明】
+  潮汐桥（GPIO 22和23）自动运行，使用与14根灯带相同的f,n命令控制
+  - GPIO 22: 2m灯带（120 LEDs）
+  - GPIO 23: 3m灯带（180 LEDs）
+  - 效果：波浪从起始端向末端传播
+  - 颜色渐变：20%红色，60%浅蓝色，20%白色
+  - 亮度渐变：从头到尾逐渐变亮
+  - 随着f,n中的n增大：传播速度变快、红色范围增多、整体亮度增加
+
+【退出】
+  q  - 退出程序并关闭所有灯
+
+【其他】
+  h  - 显示此帮助信息
+  宏命令：用分号连发多条，如 f,10;s;f,50（合并为一次发送）
+============================================================
+
+【功能说明】
+  14根灯带：
+    功能A：灯带两端区域（0-25% 和 75-100%）
+          - 间隔点亮：每隔2颗亮1颗
+          - 亮度范围：20-40
+    功能B：灯带中间区域（25-75%）
+          - 虚拟位置1-20循环传播
+          - 拖尾效果：前后各2个虚拟位置
+          - 亮度范围：0-100
+  潮汐桥：
+    - GPIO 22: 2m灯带（120 LEDs）
+    - GPIO 23: 3m灯带（180 LEDs）
+    - 波浪传播效果，颜色和亮度渐变
+============================================================
+"""
+
 def print_help():
-    """打印帮助信息"""
-    print("\n" + "=" * 60)
-    print("LED灯带控制指令说明")
-    print("=" * 60)
-    print("\n【14根灯带控制】")
-    print("  f,<0-100>  - 设置亮度值（0最低，100最高）")
-    print("              功能A：亮度映射到20-40范围")
-    print("              功能B：亮度映射到0-100范围")
-    print("              亮度从当前值平滑过渡到目标值，0→100需要16秒")
-    print("              示例：")
-    print("                f,0    - 设置亮度为0（最低）")
-    print("                f,50   - 设置亮度为50（中等）")
-    print("                f,100  - 设置亮度为100（最高）")
-    
-    print("\n【速度控制】")
-    print("  功能B的虚拟位置传播速度：v = n + 10")
-    print("  其中 n 是 f,n 命令中的亮度值")
-    print("  例如：f,50 时，速度 v = 50 + 10 = 60 虚拟位置/秒")
-    
-    print("\n【暂停控制】")
-    print("  s  - 暂停/恢复虚拟位置的移动")
-    print("       暂停时保持当前亮度，恢复后继续过渡")
-    
-    print("\n【潮汐桥说明】")
-    print("  潮汐桥（GPIO 22和23）自动运行，使用与14根灯带相同的f,n命令控制")
-    print("  - GPIO 22: 2m灯带（120 LEDs）")
-    print("  - GPIO 23: 3m灯带（180 LEDs）")
-    print("  - 效果：波浪从起始端向末端传播")
-    print("  - 颜色渐变：20%红色，60%浅蓝色，20%白色")
-    print("  - 亮度渐变：从头到尾逐渐变亮")
-    print("  - 随着f,n中的n增大：传播速度变快、红色范围增多、整体亮度增加")
-    
-    print("\n【退出】")
-    print("  q  - 退出程序并关闭所有灯")
-    
-    print("\n【其他】")
-    print("  h  - 显示此帮助信息")
-    print("=" * 60)
-    
-    print("\n【功能说明】")
-    print("  14根灯带：")
-    print("    功能A：灯带两端区域（0-25% 和 75-100%）")
-    print("          - 间隔点亮：每隔2颗亮1颗")
-    print("          - 亮度范围：20-40")
-    print("    功能B：灯带中间区域（25-75%）")
-    print("          - 虚拟位置1-20循环传播")
-    print("          - 拖尾效果：前后各2个虚拟位置")
-    print("          - 亮度范围：0-100")
-    print("  潮汐桥：")
-    print("    - GPIO 22: 2m灯带（120 LEDs）")
-    print("    - GPIO 23: 3m灯带（180 LEDs）")
-    print("    - 波浪传播效果，颜色和亮度渐变")
-    print("=" * 60)
+    """打印帮助信息（单次write输出预构建的帮助文本）"""
+    sys.stdout.write("\n" + _HELP)
+    sys.stdout.flush()
 
-def main():
-    print("=" * 60)
-    print("LED灯带控制系统")
-    print("=" * 60)
-    
-    # 连接Arduino/ESP32
-    ser = connect_arduino()
-    if ser is None:
-        return
-    
-    print_help()
-    
-    import threading
-    import queue
-    
-    # 创建一个队列用于存储串口消息
-    message_queue = queue.Queue()
-    input_queue = queue.Queue()
-    
-    # 串口读取线程
+def format_device_message(msg):
+    """设备消息转显示行（WAVE_SPAWN特殊格式化成波生成日志）"""
+    if msg.startswith("WAVE_SPAWN"):
+        # 解析并格式化波生成日志（一次正则扫描收齐所有字段）
+        wave_info = dict(_WAVE_RE.findall(msg))
+        n_val = wave_info.get('n', '?')
+        speed_val = wave_info.get('speed', '?')
+        phase_val = wave_info.get('phase', '?')
+        return f"🌊 [波生成] n={n_val}, 速度={speed_val}, 相位={phase_val}\n"
+    return f"设备: {msg}\n"
+
+def handle_command(writer, command):
+    """处理一条用户指令；返回False表示应退出主循环"""
+    # 退出命令
+    if command in _EXIT_CMDS:
+        print("\n正在退出...")
+        try:
+            writer.write_nodelay(b'q\n')  # 发送退出命令，关闭所有灯
+            time.sleep(0.1)
+        except Exception as e:
+            print(f"错误：发送命令失败 - {e}", flush=True)  # 设备已拔出也照常退出
+        return False
+
+    # 帮助命令
+    if command in _HELP_CMDS:
+        print_help()
+        return True
+
+    # 宏命令：f,10;s;f,50 —— 拆分、逐条校验、合并成一次写出
+    if ';' in command:
+        cmds = [c.strip() for c in command.split(';') if c.strip()]
+        error = next((e for e in map(validate_command, cmds) if e), None)
+        if error:
+            print(error)
+            return True
+        try:
+            send_many(writer, cmds)
+            print(f"✓ 已发送{len(cmds)}条指令: {command}", flush=True)
+        except Exception as e:
+            print(f"错误：发送命令失败 - {e}", flush=True)
+        return True
+
+    # 验证命令格式
+    error = validate_command(command)
+    if error:
+        print(error)
+        return True
+
+    # 发送命令到设备（加换行便于解析；常用命令走预编码表）
+    try:
+        writer.write(encode_command(command))
+        print(f"✓ 已发送指令: {command}", flush=True)
+        # 不再定时等待响应：响应到达后由读取侧打印
+    except Exception as e:
+        print(f"错误：发送命令失败 - {e}", flush=True)
+    return True
+
+def _run_selector(ser, writer):
+    """POSIX主循环：串口和stdin注册进同一个selector，单线程就绪驱动
+
+    不再需要读取线程、输入线程和两个队列——哪个fd就绪处理哪个，
+    空闲时整个进程睡在select里零唤醒。Windows的stdin不可select，
+    走_run_threaded。
+    """
+    prompt = "\n输入指令: "
+    sel = selectors.DefaultSelector()
+    sel.register(ser.fileno(), selectors.EVENT_READ, 'serial')
+    sel.register(sys.stdin.fileno(), selectors.EVENT_READ, 'stdin')
+    ser_buf = bytearray()
+    stdin_buf = bytearray()
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    try:
+        while True:
+            for key, _ in sel.select():
+                if key.data == 'serial':
+                    try:
+                        out_lines = [format_device_message(m) for m in drain_lines(ser, ser_buf)]
+                    except Exception:
+                        # 设备拔出等读取错误：注销该fd停止监听，主循环
+                        # 继续服务stdin（与unified的read_loop同样的处置）
+                        sel.unregister(key.fd)
+                        print("警告：串口读取出错，已停止监听设备消息", flush=True)
+                        continue
+                    if out_lines:
+                        sys.stdout.write("".join(out_lines))
+                        sys.stdout.flush()
+                    continue
+
+                # stdin就绪：绕过Python层缓冲直接读fd——readline的预读
+                # 会让整行滞留在用户态缓冲里骗过select（粘贴多行时卡住）
+                data = os.read(sys.stdin.fileno(), 4096)
+                if not data:
+                    return  # EOF
+                stdin_buf += data
+                while b'\n' in stdin_buf:
+                    line, _, rest = bytes(stdin_buf).partition(b'\n')
+                    stdin_buf[:] = rest
+                    command = line.decode('utf-8', errors='ignore').strip()
+                    if command and not handle_command(writer, command):
+                        return
+                sys.stdout.write(prompt)
+                sys.stdout.flush()
+    finally:
+        sel.close()
+
+def _run_threaded(ser, writer):
+    """Windows主循环：stdin不可select，保留读取线程+输入线程+队列"""
+    # SimpleQueue：单生产者场景下开销比Queue低，没有task_done/join的锁协议
+    message_queue = queue.SimpleQueue()
+    input_queue = queue.SimpleQueue()
+
+    # 串口读取线程：阻塞read(1)等首字节（空闲时睡在内核驱动里，
+    # 不再每10ms醒一次轮询），来数据后由drain_lines一次读走缓冲区
+    # 剩余数据并按行拆分
     def read_serial():
+        buf = bytearray()
         while True:
             try:
-                if ser.in_waiting:
-                    msg = ser.readline().decode('utf-8', errors='ignore').strip()
-                    if msg:
-                        message_queue.put(msg)
-                else:
-                    time.sleep(0.01)  # 短暂休眠，避免CPU占用过高
+                first = ser.read(1)  # 最多阻塞ser.timeout秒，字节一到立即返回
+                if not first:
+                    continue  # 超时无数据，回头继续等（daemon线程随进程退出）
+                buf += first
+                for msg in drain_lines(ser, buf):
+                    message_queue.put(msg)
             except:
                 break
-    
+
     # 用户输入线程
     def read_input():
         while True:
@@ -155,100 +457,75 @@ def main():
             except (EOFError, KeyboardInterrupt):
                 input_queue.put(None)  # 发送退出信号
                 break
-    
-    # 启动串口读取线程
+
     serial_thread = threading.Thread(target=read_serial, daemon=True)
     serial_thread.start()
-    
-    # 启动用户输入线程
     input_thread = threading.Thread(target=read_input, daemon=True)
     input_thread.start()
-    
-    try:
+
+    while True:
+        # 优先处理串口消息（实时输出）：get_nowait直接取到空为止，
+        # 整批消息攒成一个字符串、一次write+flush输出
+        out_lines = []
         while True:
-            # 优先处理串口消息（实时输出）
-            while not message_queue.empty():
-                msg = message_queue.get()
-                # 检查是否是波生成信号
-                if msg.startswith("WAVE_SPAWN"):
-                    # 解析波生成信息
-                    parts = msg.split()
-                    wave_info = {}
-                    for part in parts[1:]:  # 跳过 "WAVE_SPAWN"
-                        if '=' in part:
-                            key, value = part.split('=')
-                            wave_info[key] = value
-                    
-                    # 格式化输出波生成日志
-                    n_val = wave_info.get('n', '?')
-                    speed_val = wave_info.get('speed', '?')
-                    phase_val = wave_info.get('phase', '?')
-                    print(f"🌊 [波生成] n={n_val}, 速度={speed_val}, 相位={phase_val}", flush=True)
-                else:
-                    print(f"设备: {msg}", flush=True)
-            
-            # 检查用户输入（非阻塞）
             try:
-                command = input_queue.get_nowait()
-                if command is None:  # 退出信号
-                    break
+                out_lines.append(format_device_message(message_queue.get_nowait()))
             except queue.Empty:
-                time.sleep(0.01)  # 短暂休眠
-                continue
-            
-            if not command:
-                continue
-            
-            command_lower = command.lower()
-            
-            # 退出命令
-            if command_lower == 'q' or command_lower == 'quit':
-                print("\n正在退出...")
-                ser.write(b'q\n')  # 发送退出命令，关闭所有灯
-                time.sleep(0.1)
                 break
-            
-            # 帮助命令
-            if command_lower == 'h' or command_lower == 'help':
-                print_help()
-                continue
-            
-            # 验证命令格式
-            if command_lower.startswith('f,'):
-                # 验证f命令格式
-                try:
-                    parts = command_lower.split(',')
-                    if len(parts) != 2:
-                        print("错误：f命令格式应为 f,<0-100>")
-                        continue
-                    value = float(parts[1])
-                    if value < 0 or value > 100:
-                        print("错误：亮度值必须在0-100之间")
-                        continue
-                except ValueError:
-                    print("错误：亮度值必须是数字")
-                    continue
-            
-            # 发送命令到设备（加换行便于解析）
-            try:
-                ser.write((command + "\n").encode())
-                print(f"✓ 已发送指令: {command}", flush=True)
-                time.sleep(0.1)  # 短暂等待设备响应
-            except Exception as e:
-                print(f"错误：发送命令失败 - {e}", flush=True)
-    
+        if out_lines:
+            sys.stdout.write("".join(out_lines))
+            sys.stdout.flush()
+
+        # 等待用户输入：阻塞在C层的get上（超时后回头先处理串口消息）
+        try:
+            command = input_queue.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        if command is None:  # 退出信号
+            break
+        if command and not handle_command(writer, command):
+            break
+
+def main():
+    print("=" * 60)
+    print("LED灯带控制系统")
+    print("=" * 60)
+
+    # 连接Arduino/ESP32
+    ser = connect_arduino()
+    if ser is None:
+        return
+
+    print_help()
+
+    # 出站写合并（见CoalescingWriter）；ser_lock同时保护写入和关闭，
+    # 避免冲刷线程与close竞争。读取侧是唯一读者，读不需要锁
+    ser_lock = threading.Lock()
+    writer = CoalescingWriter(ser, lock=ser_lock)
+
+    try:
+        if sys.platform == 'win32':
+            _run_threaded(ser, writer)
+        else:
+            _run_selector(ser, writer)
+
     except KeyboardInterrupt:
         print("\n\n检测到 Ctrl+C，正在退出...")
         try:
-            ser.write(b'q\n')  # 确保关闭所有灯
+            writer.write_nodelay(b'q\n')  # 确保关闭所有灯
             time.sleep(0.1)
         except:
             pass
-    
+
     finally:
-        if ser and ser.is_open:
-            ser.close()
-            print("✓ 串口已关闭")
+        writer.close()
+        with ser_lock:  # 与可能还在收尾的冲刷线程互斥
+            if ser and ser.is_open:
+                try:
+                    ser.close()
+                    print("✓ 串口已关闭")
+                except Exception:
+                    pass  # 设备已拔出时close本身也会报错
         print("程序已退出")
 
 if __name__ == "__main__":
@@ -655,6 +655,7 @@ void setup() {
     Serial.println("Initialization complete. Ready for commands.");
     Serial.println("Commands: f,<0-100> | s | q");
     Serial.println("  f,n: 控制14根灯带（功能A和B）+ 潮汐桥（GPIO 22和23，自主运行）");
+    Serial.println("READY");  // 上位机据此结束启动等待
 }
 
 // 解析串口命令